@@ -7,13 +7,75 @@ PokéPulse Backend API Proxy
 - Manages watchlist + portfolio state
 - Serves preloaded popular cards for dashboard
 """
-import json, os, sys, sqlite3, hashlib, time
-import urllib.request, urllib.parse, urllib.error
+import base64, gzip, json, os, sys, sqlite3, hashlib, queue, random, threading, time, zlib
+import http.client, urllib.parse, urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from http import HTTPStatus
+from operator import itemgetter
 from pathlib import Path
+from wsgiref.simple_server import WSGIServer, make_server
+
+# orjson is optional; fall back to stdlib json so the proxy still runs with zero pip deps
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumpb = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumpb(obj):
+        return json.dumps(obj).encode()
+
+# Cache payloads are compressed: zstd if installed, else stdlib zlib.
+# Rows are tagged by their leading magic bytes; a zstd row read without zstandard is a cache miss.
+# zstd (de)compressor objects must not be shared between threads, so each thread gets its own.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_codecs = threading.local()
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def _compress(raw):
+    if zstandard is None:
+        return zlib.compress(raw, 6)
+    c = getattr(_codecs, "zstd_c", None)
+    if c is None:
+        c = _codecs.zstd_c = zstandard.ZstdCompressor(level=3)
+    return c.compress(raw)
+
+# Cache keys are 16-byte digests of the namespace + canonical params: blake3 if installed, else blake2b
+try:
+    import blake3
+    def _digest(raw):
+        return blake3.blake3(raw).digest(length=16)
+except ImportError:
+    def _digest(raw):
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+def _ckey(ns, params=None):
+    # stdlib json (not orjson) so keys are identical whichever serializer is installed
+    canon = json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+    return _digest(f"{ns}:{canon}".encode())
+
+def _decompress(blob):
+    """Return the JSON bytes stored in a cache row, or None if unreadable here."""
+    if blob[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            return None
+        d = getattr(_codecs, "zstd_d", None)
+        if d is None:
+            d = _codecs.zstd_d = zstandard.ZstdDecompressor()
+        return d.decompress(blob)
+    if blob[:1] == b"x":
+        return zlib.decompress(blob)
+    return None
 
 # ── Config ────────────────────────────────────────────
-DB_PATH = Path("pokepulse.db")
+# Next to this script, so CGI and `api.py serve` share one DB whatever the working directory
+DB_PATH = Path(__file__).resolve().parent / "pokepulse.db"
+SCHEMA_VERSION = 5  # bump when _init_schema changes; stored in PRAGMA user_version
 API_BASE = "https://www.pokemonpricetracker.com/api/v2"
 # API key is loaded from environment variable POKEMON_API_KEY (set on your server)
 
@@ -22,6 +84,10 @@ TTL_SETS     = 86400     # 24 hours
 TTL_CARDS    = 43200     # 12 hours for card lists
 TTL_DETAIL   = 21600     # 6 hours for card detail w/ history
 TTL_POPULAR  = 86400     # 24 hours for popular/trending
+PURGE_CHANCE = 0.01      # fraction of cache writes that also sweep expired rows
+MEM_CACHE_SIZE = 256     # in-process decoded entries (only pays off in a long-lived process)
+MEM_CACHE_TTL  = 60      # seconds; kept short so other processes' writes show up quickly
+WSGI_WORKERS   = 8       # request threads for "api.py serve"; each keeps its own DB connection
 
 # Popular queries to seed the dashboard (fetched once, cached 24hr)
 POPULAR_QUERIES = [
@@ -36,19 +102,48 @@ POPULAR_QUERIES = [
     {"search": "mew", "limit": "3", "sortBy": "price", "sortOrder": "desc"},
     {"search": "eevee", "limit": "3", "sortBy": "price", "sortOrder": "desc"},
 ]
+# Cache keys are fixed, so hash them once at import. Per-query keys match handle_cards.
+POPULAR_KEY = _ckey("popular:v2")
+POPULAR_QUERY_KEYS = [(q, _ckey("cards", q)) for q in POPULAR_QUERIES]
 
 def get_api_key():
     return os.environ.get("POKEMON_API_KEY", "")
 
 # ── DB ────────────────────────────────────────────
+_local = threading.local()
+
 def get_db():
-    db = sqlite3.connect(str(DB_PATH))
-    db.row_factory = sqlite3.Row
+    """Return this thread's connection, opening and initialising it on first use."""
+    db = getattr(_local, "db", None)
+    if db is None:
+        db = sqlite3.connect(str(DB_PATH))
+        db.row_factory = sqlite3.Row
+        _apply_pragmas(db)
+        _init_schema(db)
+        _local.db = db
+    return db
+
+def _apply_pragmas(db):
     db.execute("PRAGMA journal_mode=WAL")
+    # Safe under WAL: fsync at checkpoint only. Worst case on power loss is a cold cache entry.
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+    db.execute("PRAGMA cache_size=-65536")     # 64 MiB
+    db.execute("PRAGMA busy_timeout=3000")
+    db.execute("PRAGMA wal_autocheckpoint=1000")
+
+def _init_schema(db):
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    if version < 5:
+        # v3 switched cache_key to a hashed BLOB, v4/v5 created_at to unix seconds; cached rows are disposable
+        db.execute("DROP TABLE IF EXISTS cache")
     db.execute("""CREATE TABLE IF NOT EXISTS cache (
-        cache_key TEXT PRIMARY KEY,
-        data TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        cache_key BLOB PRIMARY KEY,
+        data BLOB,
+        created_at INTEGER DEFAULT (strftime('%s','now')),
         ttl_seconds INTEGER DEFAULT 300
     )""")
     db.execute("""CREATE TABLE IF NOT EXISTS watchlist (
@@ -72,58 +167,205 @@ def get_db():
         notes TEXT,
         added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )""")
+    # Back the ORDER BY ... DESC listings in handle_status / watchlist / portfolio
+    db.execute("CREATE INDEX IF NOT EXISTS idx_cache_created ON cache(created_at DESC)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_wl_added ON watchlist(added_at DESC)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_pf_added ON portfolio(added_at DESC)")
+    db.execute("ANALYZE")
+    db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     db.commit()
-    return db
+
+def fetch_dicts(db, sql, args=()):
+    """Run a SELECT and return plain dicts, zipping tuple rows against the column names once."""
+    cur = db.cursor()
+    cur.row_factory = None  # skip building sqlite3.Row objects
+    cur.execute(sql, args)
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 # ── Caching ─────────────────────────────────────────
+# Tier 1: decoded objects in this process (LRU + short TTL). Tier 2: SQLite.
+# Tier-1 objects are shared by every request (and thread) that hits them: treat values from
+# cache_get, and anything passed to cache_set, as read-only. Handlers copy before annotating.
+_mem = OrderedDict()  # cache_key -> (expires_at, data), least recently used first
+_mem_lock = threading.Lock()
+
+def _mem_get(key, now):
+    with _mem_lock:
+        hit = _mem.get(key)
+        if hit is None:
+            return None
+        if hit[0] < now:
+            del _mem[key]
+            return None
+        _mem.move_to_end(key)
+        return hit[1]
+
+def _mem_put(key, data, expires_at):
+    with _mem_lock:
+        _mem[key] = (expires_at, data)
+        _mem.move_to_end(key)
+        while len(_mem) > MEM_CACHE_SIZE:
+            _mem.popitem(last=False)
+
 def cache_get(db, key):
+    now = time.time()
+    data = _mem_get(key, now)
+    if data is not None:
+        return data
     row = db.execute("SELECT data, created_at, ttl_seconds FROM cache WHERE cache_key=?", (key,)).fetchone()
     if not row:
         return None
-    age = (datetime.utcnow() - datetime.fromisoformat(row["created_at"])).total_seconds()
-    if age > row["ttl_seconds"]:
-        db.execute("DELETE FROM cache WHERE cache_key=?", (key,))
-        db.commit()
+    data, created_at, ttl = row
+    # created_at is integer unix seconds: a subtract instead of parsing an ISO timestamp
+    if now - created_at > ttl:
+        return None  # stale row is overwritten by the next cache_set, or swept by purge_expired
+    raw = _decompress(data)
+    if raw is None:
         return None
-    return json.loads(row["data"])
+    data = _loads(raw)
+    _mem_put(key, data, min(now + MEM_CACHE_TTL, created_at + ttl))
+    return data
 
 def cache_set(db, key, data, ttl=300):
-    db.execute("INSERT OR REPLACE INTO cache (cache_key, data, created_at, ttl_seconds) VALUES (?,?,?,?)",
-               (key, json.dumps(data), datetime.utcnow().isoformat(), ttl))
-    db.commit()
+    cache_set_many(db, [(key, data, ttl)])
+
+def cache_set_many(db, items):
+    """Write (key, data, ttl) items in a single transaction (one commit, one fsync)."""
+    now = int(time.time())
+    rows = [(key, _compress(_dumpb(data)), now, ttl) for key, data, ttl in items]
+    with db:
+        db.executemany("INSERT OR REPLACE INTO cache (cache_key, data, created_at, ttl_seconds) VALUES (?,?,?,?)",
+                       rows)
+    for key, data, ttl in items:
+        _mem_put(key, data, now + min(MEM_CACHE_TTL, ttl))
+    if random.random() < PURGE_CHANCE:
+        purge_expired(db)
+
+def purge_expired(db):
+    """Delete every expired cache row. Kept off the read path; run occasionally instead."""
+    with db:
+        db.execute("DELETE FROM cache WHERE ? - created_at > ttl_seconds", (time.time(),))
 
 # ── API Proxy ─────────────────────────────────────
+HTTP_TIMEOUT = 25
+HTTP_POOL_SIZE = 16
+
+# Idle keep-alive connections to the upstream, shared by all threads (LIFO keeps the warmest on top)
+_idle_conns = queue.LifoQueue(maxsize=HTTP_POOL_SIZE)
+
+def _upstream_proxy():
+    """The proxy urllib would use for API_BASE (HTTPS_PROXY / HTTP_PROXY / NO_PROXY), or None."""
+    u = urllib.parse.urlsplit(API_BASE)
+    proxy = urllib.request.getproxies().get(u.scheme)
+    if not proxy or urllib.request.proxy_bypass(u.hostname):
+        return None
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    return urllib.parse.urlsplit(proxy)
+
+def _proxy_auth(proxy):
+    if proxy.username is None:
+        return {}
+    cred = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(cred.encode()).decode()}
+
+def _new_conn():
+    u = urllib.parse.urlsplit(API_BASE)
+    proxy = _upstream_proxy()
+    if proxy is None:
+        cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+        return cls(u.netloc, timeout=HTTP_TIMEOUT)
+    if u.scheme == "https":
+        # CONNECT through the proxy, then TLS end-to-end with the upstream
+        conn = http.client.HTTPSConnection(proxy.hostname, proxy.port or 80, timeout=HTTP_TIMEOUT)
+        conn.set_tunnel(u.hostname, u.port or 443, headers=_proxy_auth(proxy))
+        return conn
+    # Plain http: send absolute-form requests to the proxy (see _http_get)
+    return http.client.HTTPConnection(proxy.hostname, proxy.port or 80, timeout=HTTP_TIMEOUT)
+
+def _read_body(resp):
+    """Raw response bytes, gunzipped if the upstream compressed them."""
+    raw = resp.read()
+    if resp.headers.get("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return raw
+
+# Errors meaning a pooled keep-alive connection was closed by the server while idle.
+# Timeouts are deliberately not here: retrying one would double the wait and spend another API call.
+_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+def _exchange(conn, path, headers):
+    try:
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        return resp, _read_body(resp)
+    except BaseException:
+        conn.close()
+        raise
+
+def _http_get(path, headers):
+    """GET over a pooled keep-alive connection, so TLS setup is paid once per connection."""
+    u = urllib.parse.urlsplit(API_BASE)
+    if u.scheme == "http":
+        proxy = _upstream_proxy()
+        if proxy is not None:
+            path = f"http://{u.netloc}{path}"
+            headers = {**headers, **_proxy_auth(proxy)}
+    try:
+        conn, reused = _idle_conns.get_nowait(), True
+    except queue.Empty:
+        conn, reused = _new_conn(), False
+    try:
+        resp, body = _exchange(conn, path, headers)
+    except _STALE_CONN_ERRORS:
+        if not reused:
+            raise
+        # The server dropped an idle connection; retry once on a fresh one
+        conn = _new_conn()
+        resp, body = _exchange(conn, path, headers)
+    if resp.will_close:
+        conn.close()
+    else:
+        try:
+            _idle_conns.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    return resp.status, resp.headers, body
+
 def api_fetch(endpoint, params=None):
     key = get_api_key()
     if not key:
         return {"error": "API key not configured"}, 500
 
-    url = f"{API_BASE}/{endpoint}"
+    path = f"{urllib.parse.urlsplit(API_BASE).path}/{endpoint}"
     if params:
-        url += "?" + urllib.parse.urlencode(params)
-
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {key}")
-    req.add_header("User-Agent", "PokePulse/2.0")
-    req.add_header("Accept", "application/json")
+        path += "?" + urllib.parse.urlencode(params)
 
     try:
-        with urllib.request.urlopen(req, timeout=25) as resp:
-            data = json.loads(resp.read().decode())
-            headers = dict(resp.headers)
-            data["_rateLimit"] = {
-                "limit": headers.get("X-RateLimit-Limit"),
-                "remaining": headers.get("X-RateLimit-Remaining"),
-                "reset": headers.get("X-RateLimit-Reset"),
-            }
-            return data, 200
-    except urllib.error.HTTPError as e:
-        body = e.read().decode() if e.fp else "{}"
+        status, headers, raw = _http_get(path, {
+            "Authorization": f"Bearer {key}",
+            "User-Agent": "PokePulse/2.0",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        })
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+    if status >= 300:
         try:
-            err = json.loads(body)
+            err = _loads(raw)
         except:
-            err = {"error": body}
-        return err, e.code
+            err = {"error": raw.decode(errors="replace")}
+        return err, status
+    try:
+        data = _loads(raw)
+        data["_rateLimit"] = {
+            "limit": headers.get("X-RateLimit-Limit"),
+            "remaining": headers.get("X-RateLimit-Remaining"),
+            "reset": headers.get("X-RateLimit-Reset"),
+        }
+        return data, 200
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -133,26 +375,47 @@ def handle_popular(params):
     """Serve curated popular cards. Cached 24hr. 
     Fetches multiple search queries and merges, dedupes, sorts by price."""
     db = get_db()
-    cache_key = "popular:v2"
-    cached = cache_get(db, cache_key)
+    cached = cache_get(db, POPULAR_KEY)
     if cached:
-        cached["_cached"] = True
-        return cached, 200
-
-    # Fetch each popular query (costs ~10 API calls total, cached for 24hr)
-    all_cards = []
-    seen_ids = set()
-    for q in POPULAR_QUERIES:
-        data, status = api_fetch("cards", q)
+        return {**cached, "_cached": True}, 200
+
+    # Reuse any per-query rows still fresh from an earlier fan-out or card search,
+    # then fetch the rest (up to ~10 API calls, cached for 12-24hr).
+    # Requests run concurrently; results are merged here on the main thread.
+    by_key = {}
+    missing = []
+    for q, key in POPULAR_QUERY_KEYS:
+        data = cache_get(db, key)
+        if data is not None:
+            by_key[key] = (data, 200)
+        else:
+            missing.append((q, key))
+
+    to_cache = []
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+            futures = {ex.submit(api_fetch, "cards", q): key for q, key in missing}
+            for f in as_completed(futures):
+                data, status = f.result()
+                if status == 200:
+                    to_cache.append((futures[f], data, TTL_CARDS))
+                by_key[futures[f]] = (data, status)
+
+    # Merge in POPULAR_QUERIES order, not completion order, so the output doesn't depend on
+    # network timing. Dedupe by card id; the first copy seen wins.
+    cards_by_id = {}
+    for _, key in POPULAR_QUERY_KEYS:
+        data, status = by_key[key]
         if status == 200 and "data" in data:
             for card in data["data"]:
                 cid = card.get("tcgPlayerId") or card.get("id")
-                if cid and cid not in seen_ids:
-                    seen_ids.add(cid)
-                    all_cards.append(card)
+                if cid:
+                    cards_by_id.setdefault(cid, card)
 
-    # Sort by market price descending
-    all_cards.sort(key=lambda c: c.get("prices", {}).get("market") or 0, reverse=True)
+    # Sort by market price descending (keys computed once per card, not per comparison)
+    keyed = [((c.get("prices") or {}).get("market") or 0, c) for c in cards_by_id.values()]
+    keyed.sort(key=itemgetter(0), reverse=True)
+    all_cards = [c for _, c in keyed]
 
     result = {
         "data": all_cards,
@@ -162,31 +425,30 @@ def handle_popular(params):
             "source": "curated_popular",
         }
     }
-    cache_set(db, cache_key, result, ttl=TTL_POPULAR)
+    to_cache.append((POPULAR_KEY, result, TTL_POPULAR))
+    cache_set_many(db, to_cache)
     return result, 200
 
 def handle_sets(params):
-    cache_key = f"sets:{json.dumps(params, sort_keys=True)}"
+    cache_key = _ckey("sets", params)
     db = get_db()
     cached = cache_get(db, cache_key)
     if cached:
-        cached["_cached"] = True
-        return cached, 200
+        return {**cached, "_cached": True}, 200
     data, status = api_fetch("sets", params)
     if status == 200:
         cache_set(db, cache_key, data, ttl=TTL_SETS)
     return data, status
 
 def handle_cards(params):
-    cache_key = f"cards:{json.dumps(params, sort_keys=True)}"
+    cache_key = _ckey("cards", params)
     db = get_db()
     include_history = params.get("includeHistory", "false") == "true"
     ttl = TTL_DETAIL if include_history else TTL_CARDS
 
     cached = cache_get(db, cache_key)
     if cached:
-        cached["_cached"] = True
-        return cached, 200
+        return {**cached, "_cached": True}, 200
 
     data, status = api_fetch("cards", params)
     if status == 200:
@@ -207,8 +469,7 @@ def handle_card_detail(params):
 def handle_watchlist(method, params, body):
     db = get_db()
     if method == "GET":
-        rows = db.execute("SELECT * FROM watchlist ORDER BY added_at DESC").fetchall()
-        cards = [dict(r) for r in rows]
+        cards = fetch_dicts(db, "SELECT * FROM watchlist ORDER BY added_at DESC")
         return {"cards": cards, "count": len(cards)}, 200
     elif method == "POST":
         card_id = body.get("card_id", "")
@@ -232,11 +493,21 @@ def handle_watchlist(method, params, body):
             db.commit()
         return {"status": "ok"}, 200
 
+# Whitelisted PUT columns. Fields are always taken in this order, so at most 2^6 distinct
+# UPDATE strings exist and sqlite3's per-connection statement cache reuses their plans.
+PORTFOLIO_UPDATABLE = ("quantity", "purchase_price", "purchase_date", "notes", "variant", "condition")
+_update_sql = {}
+
+def _portfolio_update_sql(fields):
+    sql = _update_sql.get(fields)
+    if sql is None:
+        sql = _update_sql[fields] = f"UPDATE portfolio SET {', '.join(f + '=?' for f in fields)} WHERE id=?"
+    return sql
+
 def handle_portfolio(method, params, body):
     db = get_db()
     if method == "GET":
-        rows = db.execute("SELECT * FROM portfolio ORDER BY added_at DESC").fetchall()
-        items = [dict(r) for r in rows]
+        items = fetch_dicts(db, "SELECT * FROM portfolio ORDER BY added_at DESC")
         return {"items": items, "count": len(items)}, 200
     elif method == "POST":
         card_id = body.get("card_id", "")
@@ -258,15 +529,11 @@ def handle_portfolio(method, params, body):
         item_id = body.get("id")
         if not item_id:
             return {"error": "id required"}, 400
-        fields = []
-        values = []
-        for f in ["quantity", "purchase_price", "purchase_date", "notes", "variant", "condition"]:
-            if f in body:
-                fields.append(f"{f}=?")
-                values.append(body[f])
+        fields = tuple(f for f in PORTFOLIO_UPDATABLE if f in body)
         if fields:
+            values = [body[f] for f in fields]
             values.append(item_id)
-            db.execute(f"UPDATE portfolio SET {', '.join(fields)} WHERE id=?", values)
+            db.execute(_portfolio_update_sql(fields), values)
             db.commit()
         return {"status": "updated", "id": item_id}, 200
     elif method == "DELETE":
@@ -278,16 +545,18 @@ def handle_portfolio(method, params, body):
 
 def handle_status():
     db = get_db()
+    purge_expired(db)
     wl_count = db.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
     pf_count = db.execute("SELECT COUNT(*) FROM portfolio").fetchone()[0]
     cache_count = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
     # Show cache stats
     cache_rows = db.execute("SELECT cache_key, created_at, ttl_seconds FROM cache ORDER BY created_at DESC LIMIT 20").fetchall()
     cache_detail = []
+    now = time.time()
     for r in cache_rows:
-        age = (datetime.utcnow() - datetime.fromisoformat(r["created_at"])).total_seconds()
+        age = now - r["created_at"]
         cache_detail.append({
-            "key": r["cache_key"][:50],
+            "key": r["cache_key"].hex(),
             "age_mins": round(age / 60, 1),
             "ttl_hrs": round(r["ttl_seconds"] / 3600, 1),
             "fresh": age < r["ttl_seconds"],
@@ -302,46 +571,99 @@ def handle_status():
         "timestamp": datetime.utcnow().isoformat(),
     }, 200
 
-# ── Main CGI handler ────────────────────────────
-def main():
-    method = os.environ.get("REQUEST_METHOD", "GET")
-    query_string = os.environ.get("QUERY_STRING", "")
-    params = dict(urllib.parse.parse_qsl(query_string))
+# ── Request dispatch ────────────────────────────
+def parse_request(environ, stdin):
+    """Pull (action, method, params, body) out of a CGI/WSGI environ + binary input stream."""
+    method = environ.get("REQUEST_METHOD", "GET")
+    params = dict(urllib.parse.parse_qsl(environ.get("QUERY_STRING", "")))
     action = params.pop("action", "")
 
     body = {}
     if method in ("POST", "PUT", "DELETE"):
         try:
-            length = int(os.environ.get("CONTENT_LENGTH", 0))
-            raw = sys.stdin.read(length) if length else "{}"
-            body = json.loads(raw) if raw else {}
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            raw = stdin.read(length) if length else b"{}"
+            body = _loads(raw) if raw else {}
         except:
             body = {}
+    return action, method, params, body
 
-    if action == "popular":
-        result, status = handle_popular(params)
-    elif action == "sets":
-        result, status = handle_sets(params)
-    elif action == "cards":
-        result, status = handle_cards(params)
-    elif action == "card":
-        result, status = handle_card_detail(params)
-    elif action == "watchlist":
-        result, status = handle_watchlist(method, params, body)
-    elif action == "portfolio":
-        result, status = handle_portfolio(method, params, body)
-    elif action == "status":
-        result, status = handle_status()
-    else:
-        result = {"error": "unknown action", "actions": [
-            "popular", "sets", "cards", "card", "watchlist", "portfolio", "status"
-        ]}
-        status = 400
+# Uniform (method, params, body) signature so dispatch is one dict lookup
+_HANDLERS = {
+    "popular":   lambda m, p, b: handle_popular(p),
+    "sets":      lambda m, p, b: handle_sets(p),
+    "cards":     lambda m, p, b: handle_cards(p),
+    "card":      lambda m, p, b: handle_card_detail(p),
+    "watchlist": handle_watchlist,
+    "portfolio": handle_portfolio,
+    "status":    lambda m, p, b: handle_status(),
+}
+
+def dispatch(action, method, params, body):
+    handler = _HANDLERS.get(action)
+    if handler is None:
+        return {"error": "unknown action", "actions": list(_HANDLERS)}, 400
+    return handler(method, params, body)
+
+# ── Main CGI handler ────────────────────────────
+def main():
+    result, status = dispatch(*parse_request(os.environ, sys.stdin.buffer))
 
     print(f"Status: {status}")
     print("Content-Type: application/json")
     print()
-    print(json.dumps(result))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumpb(result) + b"\n")
+
+# ── WSGI app (long-lived process) ───────────────
+# Same handlers as CGI, but the interpreter, DB connection and upstream
+# connection pool survive across requests. Host with any WSGI server, or:
+#   python api.py serve [port]
+def application(environ, start_response):
+    result, status = dispatch(*parse_request(environ, environ["wsgi.input"]))
+    payload = _dumpb(result)
+    try:
+        phrase = HTTPStatus(status).phrase
+    except ValueError:
+        phrase = "Unknown"  # non-standard upstream codes, e.g. Cloudflare 520/522
+    start_response(f"{status} {phrase}", [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(payload))),
+    ])
+    return [payload]
+
+class _PooledWSGIServer(WSGIServer):
+    """Handle requests on a fixed set of long-lived worker threads.
+
+    Unlike ThreadingMixIn (one new thread per request), workers persist, so each
+    one keeps its thread-local SQLite connection and zstd codecs across requests.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._workers = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix="api")
+
+    def process_request(self, request, client_address):
+        self._workers.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._workers.shutdown(wait=True)
+
+def serve(host="127.0.0.1", port=8000):
+    with make_server(host, port, application, server_class=_PooledWSGIServer) as httpd:
+        print(f"PokéPulse API listening on http://{host}:{port}", file=sys.stderr)
+        httpd.serve_forever()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+    else:
+        main()